@@ -1,19 +1,33 @@
 """NIC.RU (Ru-Center) DNS API library."""
 
 
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Union
 from xml.etree import ElementTree
+import hashlib
 import importlib.metadata
+import json
 import logging
+import operator
+import os
+import tempfile
+import threading
+import time
 
 from requests_oauthlib import OAuth2Session
 from oauthlib.oauth2 import (
     LegacyApplicationClient,
     InvalidGrantError,
     InvalidClientError,
+    TokenExpiredError,
     UnauthorizedClientError,
 )
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import requests
 
 from nic_api.exceptions import (
@@ -25,6 +39,7 @@ from nic_api.exceptions import (
 )
 from nic_api.models import (
     parse_record,
+    parse_records_stream,
     NICService,
     NICZone,
     DNSRecord,
@@ -47,167 +62,200 @@ from nic_api.models import (
 __version__ = importlib.metadata.version("nic_api")
 
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Request body template for DnsApi.add_record()
+_ADD_RECORDS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" ?>'
+    "<request><rr-list>"
+    "{}"
+    "</rr-list></request>"
+)
+
+
+# Tokens received by DnsApi.get_token(), shared by all DnsApi instances of
+# the process and keyed by the application, scope and account credentials
+_TOKENS = {}
+_TOKENS_LOCK = threading.Lock()
+
+
+def _is_token_fresh(token):
+    """Returns if a token is not going to expire in the next minute."""
+    return token.get("expires_at", 0) > time.time() + 60
+
+
+def _is_token_usable(token):
+    """Returns if a token can be used without asking for the password."""
+    if "refresh_token" in token:
+        return True
+    return _is_token_fresh(token)
+
+
+def clear_token_cache():
+    """Forgets tokens received by DnsApi.get_token() in this process."""
+    with _TOKENS_LOCK:
+        _TOKENS.clear()
 
 
 def _is_sequence(arg):
     """Returns if argument is list/tuple/etc. or not."""
-    return (
-        not hasattr(arg, "strip")
-        and hasattr(arg, "__getitem__")
-        or hasattr(arg, "__iter__")
-    )
+    if isinstance(arg, (list, tuple, set, frozenset)):
+        return True
+    return hasattr(arg, "__iter__") and not isinstance(arg, (str, bytes))
+
+
+def _record_id(value):
+    """Returns a record ID as int, rejecting non-integer values."""
+    if isinstance(value, str):
+        if not (value.isascii() and value.isdigit()):
+            raise ValueError("Invalid record ID: {!r}".format(value))
+        return int(value)
+    if isinstance(value, bool):
+        raise TypeError("Invalid record ID: {!r}".format(value))
+    try:
+        return operator.index(value)
+    except TypeError:
+        raise TypeError("Invalid record ID: {!r}".format(value)) from None
+
+
+_FORMAT_DEFAULT = "{:45} {:6} {:6} {}"
+_FORMAT_MX = "{:45} {:6} {:6} {:4} {}"
+_FORMAT_SOA = (
+    "{name:30} IN SOA {mname} {rname} (\n"
+    "{serial:>50} ; Serial\n"
+    "{refresh:>50} ; Refresh\n"
+    "{retry:>50} ; Retry\n"
+    "{expire:>50} ; Expire\n"
+    "{minimum:>50} ; Minimum\n"
+    "{bracket:>50}"
+)
+_FORMAT_SRV = "{:45} {:6} {:6} {:6} {:6} {:6} {:45}"
+_FORMAT_HINFO = '{:45} {:6} {:6} "{}" "{}"'
+_FORMAT_NAPTR = '{:45} {:6} {:6} {:6} {:6} "{}" "{}" "{}" "{}"'
+_FORMAT_RP = "{:45} {:6} {:6} {} {}"
+
+
+def _ttl_text(record):
+    """Returns record TTL for pprint(), or an empty string if it is not set."""
+    return record.ttl if record.ttl is not None else ""
+
+
+# Functions formatting records for pprint(), by record class
+_PRINTERS = {
+    ARecord: lambda record: _FORMAT_DEFAULT.format(
+        record.name,
+        _ttl_text(record),
+        "A",
+        record.a,
+    ),
+    AAAARecord: lambda record: _FORMAT_DEFAULT.format(
+        record.name,
+        _ttl_text(record),
+        "AAAA",
+        record.aaaa,
+    ),
+    CNAMERecord: lambda record: _FORMAT_DEFAULT.format(
+        record.name,
+        _ttl_text(record),
+        "CNAME",
+        record.cname,
+    ),
+    MXRecord: lambda record: _FORMAT_MX.format(
+        record.name,
+        _ttl_text(record),
+        "MX",
+        record.preference,
+        record.exchange,
+    ),
+    TXTRecord: lambda record: _FORMAT_DEFAULT.format(
+        record.name,
+        _ttl_text(record),
+        "TXT",
+        record.txt,
+    ),
+    NSRecord: lambda record: _FORMAT_DEFAULT.format(
+        record.name, " ", "NS", record.ns
+    ),
+    SOARecord: lambda record: _FORMAT_SOA.format(
+        name=record.name,
+        mname=record.mname.name,
+        rname=record.rname.name,
+        serial=record.serial,
+        refresh=record.refresh,
+        retry=record.retry,
+        expire=record.expire,
+        minimum=record.minimum,
+        bracket=")",
+    ),
+    SRVRecord: lambda record: _FORMAT_SRV.format(
+        record.name,
+        _ttl_text(record),
+        "SRV",
+        record.priority,
+        record.weight,
+        record.port,
+        record.target,
+    ),
+    PTRRecord: lambda record: _FORMAT_DEFAULT.format(
+        record.name if record.name is not None else "",
+        _ttl_text(record),
+        "PTR",
+        record.ptr,
+    ),
+    DNAMERecord: lambda record: _FORMAT_DEFAULT.format(
+        record.name,
+        _ttl_text(record),
+        "DNAME",
+        record.dname,
+    ),
+    HINFORecord: lambda record: _FORMAT_HINFO.format(
+        record.name,
+        _ttl_text(record),
+        "HINFO",
+        record.hardware,
+        record.os,
+    ),
+    NAPTRRecord: lambda record: _FORMAT_NAPTR.format(
+        record.name,
+        _ttl_text(record),
+        "NAPTR",
+        record.order,
+        record.preference,
+        record.flags,
+        record.service,
+        record.regexp if record.regexp is not None else "",
+        record.replacement if record.replacement is not None else "",
+    ),
+    RPRecord: lambda record: _FORMAT_RP.format(
+        record.name,
+        _ttl_text(record),
+        "RP",
+        record.mbox,
+        record.txt,
+    ),
+}
 
 
 def pprint(record):
     """Pretty print for DNS records."""
-    _format_default = "{:45} {:6} {:6} {}"
-    _format_mx = "{:45} {:6} {:6} {:4} {}"
-    _format_soa = (
-        "{name:30} IN SOA {mname} {rname} (\n"
-        "{serial:>50} ; Serial\n"
-        "{refresh:>50} ; Refresh\n"
-        "{retry:>50} ; Retry\n"
-        "{expire:>50} ; Expire\n"
-        "{minimum:>50} ; Minimum\n"
-        "{bracket:>50}"
-    )
-    _format_srv = "{:45} {:6} {:6} {:6} {:6} {:6} {:45}"
-    _format_hinfo = '{:45} {:6} {:6} "{}" "{}"'
-    _format_naptr = '{:45} {:6} {:6} {:6} {:6} "{}" "{}" "{}" "{}"'
-    _format_rp = "{:45} {:6} {:6} {} {}"
-
-    if isinstance(record, ARecord):
-        print(
-            _format_default.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "A",
-                record.a,
-            )
-        )
-    elif isinstance(record, AAAARecord):
-        print(
-            _format_default.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "AAAA",
-                record.aaaa,
-            )
-        )
-    elif isinstance(record, CNAMERecord):
-        print(
-            _format_default.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "CNAME",
-                record.cname,
-            )
-        )
-    elif isinstance(record, MXRecord):
-        print(
-            _format_mx.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "MX",
-                record.preference,
-                record.exchange,
-            )
-        )
-    elif isinstance(record, TXTRecord):
-        print(
-            _format_default.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "TXT",
-                record.txt,
-            )
-        )
-    elif isinstance(record, NSRecord):
-        print(_format_default.format(record.name, " ", "NS", record.ns))
-    elif isinstance(record, SOARecord):
-        print(
-            _format_soa.format(
-                name=record.name,
-                mname=record.mname.name,
-                rname=record.rname.name,
-                serial=record.serial,
-                refresh=record.refresh,
-                retry=record.retry,
-                expire=record.expire,
-                minimum=record.minimum,
-                bracket=")",
-            )
-        )
-    elif isinstance(record, SRVRecord):
-        print(
-            _format_srv.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "SRV",
-                record.priority,
-                record.weight,
-                record.port,
-                record.target,
-            )
-        )
-    elif isinstance(record, PTRRecord):
-        print(
-            _format_default.format(
-                record.name if record.name is not None else "",
-                record.ttl if record.ttl is not None else "",
-                "PTR",
-                record.ptr,
-            )
-        )
-    elif isinstance(record, DNAMERecord):
-        print(
-            _format_default.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "DNAME",
-                record.dname,
-            )
-        )
-    elif isinstance(record, HINFORecord):
-        print(
-            _format_hinfo.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "HINFO",
-                record.hardware,
-                record.os,
-            )
-        )
-    elif isinstance(record, NAPTRRecord):
-        print(
-            _format_naptr.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "NAPTR",
-                record.order,
-                record.preference,
-                record.flags,
-                record.service,
-                record.regexp if record.regexp is not None else "",
-                record.replacement if record.replacement is not None else "",
-            )
-        )
-    elif isinstance(record, RPRecord):
-        print(
-            _format_rp.format(
-                record.name,
-                record.ttl if record.ttl is not None else "",
-                "RP",
-                record.mbox,
-                record.txt,
-            )
-        )
-    else:
+    printer = _PRINTERS.get(type(record))
+    if printer is None:
         print(record)
         print("Unknown record type: {}".format(type(record)))
+        return
+    print(printer(record))
+
+
+# Exceptions by API error codes, used by raise_error()
+_ERRORS = {
+    4097: ExpiredToken,
+    4327: InvalidRecord,
+    4009: ServiceNotFound,
+    4028: ZoneNotFound,
+}
 
 
-def raise_error(raw_xml: str):
+def raise_error(raw_xml: Union[str, bytes]):
     """Tries to parse API errors and raise proper exception."""
     try:
         root = ElementTree.fromstring(raw_xml)
@@ -218,16 +266,25 @@ def raise_error(raw_xml: str):
     if len(errors) != 1:
         return
 
-    error_code = int(errors[0].attrib.get("code", -1))
-    error_text = errors[0].text
-    if error_code == 4097:
-        raise ExpiredToken(error_text)
-    elif error_code == 4327:
-        raise InvalidRecord(error_text)
-    elif error_code == 4009:
-        raise ServiceNotFound(error_text)
-    elif error_code == 4028:
-        raise ZoneNotFound(error_text)
+    exception_class = _ERRORS.get(int(errors[0].attrib.get("code", -1)))
+    if exception_class is not None:
+        raise exception_class(errors[0].text)
+
+
+def _check_response(response: requests.Response, message=None):
+    """Raises a proper exception if the API request has failed.
+
+    Arguments:
+        response: an instance of requests.Response;
+        message: a description of the failed action for the exception.
+    """
+    if response.status_code == requests.codes.ok:
+        return
+    raise_error(response.content)
+    text = response.text
+    if message is not None:
+        text = "{}:\n{}".format(message, text)
+    raise DnsApiException(text)
 
 
 def get_data(response: requests.Response):
@@ -239,11 +296,9 @@ def get_data(response: requests.Response):
     Returns:
         (xml.etree.ElementTree.Element) <data> tag of response.
     """
-    if response.status_code != requests.codes.ok:
-        raise_error(response.text)
-        raise DnsApiException(response.text)
+    _check_response(response)
 
-    root = ElementTree.fromstring(response.text)
+    root = ElementTree.fromstring(response.content)
     datas = root.findall("data")
     if len(datas) != 1:
         raise ValueError(
@@ -253,6 +308,19 @@ def get_data(response: requests.Response):
     return datas[0]
 
 
+def _iter_zone_records(content: bytes, zone: str) -> Iterator[DNSRecord]:
+    """Parses <rr> tags from the raw XML response one by one.
+
+    Arguments:
+        content: raw bytes of the API response;
+        zone: name of the zone that the response should describe;
+
+    Returns:
+        an iterator over DNSRecord subclasses objects.
+    """
+    return parse_records_stream(BytesIO(content), zone=zone)
+
+
 class DnsApi(object):
     """Class for managing NIC.RU DNS services by API.
 
@@ -265,7 +333,11 @@ class DnsApi(object):
         token: oauthlib.oauth2.rfc6749.tokens.OAuth2Token;
         token_updater_clb: a function to call when token is updated;
         offline: lifetime of a token that app should request from OAuth;
-        scope: scope for NIC.RU services that should be requested.
+        scope: scope for NIC.RU services that should be requested;
+        token_cache_path: path to a file for keeping the token between runs;
+        pool_maxsize: number of connections to the API kept open for reuse;
+        cache_ttl: seconds to reuse results of services() and zones() for,
+            0 disables caching.
 
     You can obtain these credentials at the NIC.RU application authorization
     page: https://www.nic.ru/manager/oauth.cgi?step=oauth.app_register
@@ -288,41 +360,128 @@ class DnsApi(object):
         token_updater_clb=None,
         offline=3600,
         scope=".+:/dns-master/.+",
+        token_cache_path=None,
+        pool_maxsize=16,
+        cache_ttl=0,
     ):
         self._app_login = app_login
         self._app_password = app_password
+        self._token_cache_path = token_cache_path
+        self._token_key = None
+        if token is None and token_cache_path is not None:
+            token = self._load_cached_token()
         self._token = token
         self._token_updater_clb = token_updater_clb
         self._offline = offline
         self._scope = scope
-
-        # Setup session
+        self._cache_ttl = cache_ttl
+        self._cache = {}
+        # Serializes token refreshes of threads sharing the session
+        self._refresh_lock = threading.RLock()
+
+        # Setup session. Expired tokens are refreshed by _request() instead
+        # of the session itself, so that concurrent requests do not spend
+        # the same refresh token several times.
         self._session = OAuth2Session(
             client=LegacyApplicationClient(
                 client_id=self._app_login,
                 scope=self._scope,
             ),
-            auto_refresh_url=self.token_url,
-            auto_refresh_kwargs={
-                "client_id": self._app_login,
-                "client_secret": self._app_password,
-                "offline": self._offline,
-            },
             token_updater=self._token_updater,
             token=self._token,
         )
+        # Keep connections to the API alive between calls and retry GET
+        # requests on temporary gateway errors. PUT appends records and
+        # DELETE fails for an already deleted record, so a retry of them
+        # after a lost response could duplicate records or report an error.
+        self._session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=pool_maxsize,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.2,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                ),
+            ),
+        )
 
     @property
     def token_url(self):
-        return "{}/oauth/token".format(self.base_url)
+        return f"{self.base_url}/oauth/token"
 
     def _token_updater(self, token):
         self._token = token
+        if self._token_key is not None:
+            with _TOKENS_LOCK:
+                _TOKENS[self._token_key] = token
+        if self._token_cache_path is not None:
+            self._save_cached_token(token)
         if self._token_updater_clb is not None:
             self._token_updater_clb(token)
 
+    def _load_cached_token(self):
+        """Loads the token saved by a previous run if it is still usable."""
+        try:
+            with open(self._token_cache_path) as cache_file:
+                token = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(token, dict) or not _is_token_usable(token):
+            return None
+        return token
+
+    def _save_cached_token(self, token):
+        """Saves the token to the cache file readable only by the owner.
+
+        The token is written to a temporary file which then replaces the
+        cache file, so readers never see a partially written token.
+        """
+        # mkstemp() creates the file with 0o600 permissions
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self._token_cache_path)),
+            prefix=".nic_api_token_",
+        )
+        try:
+            with os.fdopen(fd, "w") as cache_file:
+                json.dump(token, cache_file, sort_keys=True)
+            os.replace(tmp_path, self._token_cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
     def get_token(self, username, password) -> None:
-        """Gets authorization token."""
+        """Gets authorization token.
+
+        A token received earlier in this process for the same application
+        and account is reused without a request to the API while it has not
+        expired. An expired token is not refreshed here, a new one is
+        requested with the password instead. A new token is requested as
+        well if the cached one is already used by this object, so calling
+        this method again after the API rejected the token logs in again.
+        """
+        key = (
+            self._app_login,
+            hashlib.sha256(self._app_password.encode()).hexdigest(),
+            self._scope,
+            self._offline,
+            username,
+            hashlib.sha256(password.encode()).hexdigest(),
+        )
+        with _TOKENS_LOCK:
+            token = _TOKENS.get(key)
+        if (
+            token is not None
+            and _is_token_fresh(token)
+            and token is not self._token
+        ):
+            self._session.token = token
+            self._token_key = key
+            self._token_updater(token)
+            return
         try:
             token = self._session.fetch_token(
                 token_url=self.token_url,
@@ -338,40 +497,80 @@ class DnsApi(object):
             UnauthorizedClientError,
         ) as err:
             raise DnsApiException(str(err))
+        self._token_key = key
         self._token_updater(token)
 
     def refresh_token(self, refresh_token) -> None:
         """Refreshes authorization token."""
-        try:
-            token = self._session.refresh_token(
-                token_url=self.token_url,
-                refresh_token=refresh_token,
-                client_id=self._app_login,
-                client_secret=self._app_password,
-                offline=self._offline,
-            )
-        except (InvalidGrantError, InvalidClientError) as err:
-            raise DnsApiException(str(err))
-        self._token_updater(token)
+        with self._refresh_lock:
+            try:
+                token = self._session.refresh_token(
+                    token_url=self.token_url,
+                    refresh_token=refresh_token,
+                    client_id=self._app_login,
+                    client_secret=self._app_password,
+                    offline=self._offline,
+                )
+            except (InvalidGrantError, InvalidClientError) as err:
+                raise DnsApiException(str(err))
+            self._token_updater(token)
+
+    def _refresh_expiring_token(self) -> None:
+        """Refreshes the session token if it expires within a minute.
+
+        Threads waiting for the lock reuse the token refreshed by the first
+        of them instead of spending the same refresh token again.
+        """
+        with self._refresh_lock:
+            token = self._session.token
+            if not token or "expires_at" not in token:
+                return
+            if _is_token_fresh(token):
+                return
+            if "refresh_token" in token:
+                self.refresh_token(token["refresh_token"])
+            elif token["expires_at"] < time.time():
+                raise ExpiredToken("Access token has expired")
 
     def _url_for(self, url):
-        return "{}/dns-master/{}".format(self.base_url, url)
+        return f"{self.base_url}/dns-master/{url}"
 
-    def _get(self, url):
+    def _request(self, method, url, **kwargs):
+        """Sends a request, refreshing the token first if it has expired."""
+        try:
+            return self._session.request(method, self._url_for(url), **kwargs)
+        except TokenExpiredError:
+            self._refresh_expiring_token()
+            return self._session.request(method, self._url_for(url), **kwargs)
+
+    def _get(self, url, stream=False):
         """Wraps requests.get()"""
-        return self._session.get(self._url_for(url))
+        return self._request("GET", url, stream=stream)
 
     def _post(self, url, data=None):
         """Wraps requests.post()"""
-        return self._session.post(self._url_for(url), data=data)
+        return self._request("POST", url, data=data)
 
     def _put(self, url, data=None):
         """Wraps requests.put()"""
-        return self._session.put(self._url_for(url), data=data)
+        return self._request("PUT", url, data=data)
 
     def _delete(self, url):
         """Wraps requests.delete()"""
-        return self._session.delete(self._url_for(url))
+        return self._request("DELETE", url)
+
+    def _cached(self, key):
+        """Returns a copy of a cached result if it is not older than TTL."""
+        entry = self._cache.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self._cache_ttl:
+            return None
+        return list(entry[1])
+
+    def _cache_result(self, key, result):
+        """Saves a result of a request if caching is enabled."""
+        if self._cache_ttl > 0:
+            self._cache[key] = (time.monotonic(), list(result))
+        return result
 
     def services(self) -> List[NICService]:
         """Get services available for management.
@@ -379,9 +578,14 @@ class DnsApi(object):
         Returns:
             a list of NICService objects.
         """
+        services = self._cached(("services",))
+        if services is not None:
+            return services
         response = self._get("services")
         data = get_data(response)
-        return [NICService.from_xml(service) for service in data]
+        return self._cache_result(
+            ("services",), [NICService.from_xml(service) for service in data]
+        )
 
     def zones(self, service=None) -> List[NICZone]:
         """Get zones in service.
@@ -390,24 +594,53 @@ class DnsApi(object):
             a list of NICZone objects.
         """
         service = self.default_service if service is None else service
+        zones = self._cached(("zones", service))
+        if zones is not None:
+            return zones
         if service is None:
             response = self._get("zones")
         else:
-            response = self._get("services/{}/zones".format(service))
+            response = self._get(f"services/{service}/zones")
         data = get_data(response)
-        return [NICZone.from_xml(zone) for zone in data]
+        return self._cache_result(
+            ("zones", service), [NICZone.from_xml(zone) for zone in data]
+        )
 
     def zonefile(self, service=None, zone=None) -> str:
         """Get zone file for single zone.
 
+        The content is decoded with the charset of the response. Raises
+        DnsApiException if the API returns an error.
+
         Returns:
             a string with zonefile content.
         """
         service = self.default_service if service is None else service
         zone = self.default_zone if zone is None else zone
-        response = self._get("services/{}/zones/{}".format(service, zone))
+        response = self._get(f"services/{service}/zones/{zone}")
+        _check_response(response, "Failed to get zone file")
         return response.text
 
+    def zonefile_stream(
+        self, service=None, zone=None, chunk_size=65536
+    ) -> Iterator[bytes]:
+        """Get zone file for single zone in chunks, without loading the whole
+        file into memory. The request is sent when the iteration starts.
+
+        Returns:
+            an iterator over bytes chunks of zonefile content.
+        """
+        service = self.default_service if service is None else service
+        zone = self.default_zone if zone is None else zone
+        response = self._get(f"services/{service}/zones/{zone}", stream=True)
+        try:
+            _check_response(response, "Failed to get zone file")
+            yield from response.iter_content(chunk_size)
+        finally:
+            # Return the connection to the pool even if the caller stops
+            # iterating before the whole file is read
+            response.close()
+
     def records(self, service=None, zone=None) -> List[DNSRecord]:
         """Get all records for single zone.
 
@@ -417,12 +650,39 @@ class DnsApi(object):
         service = self.default_service if service is None else service
         zone = self.default_zone if zone is None else zone
         response = self._get(
-            "services/{}/zones/{}/records".format(service, zone)
+            f"services/{service}/zones/{zone}/records", stream=True
         )
-        data = get_data(response)
-        _zone = data.find("zone")
-        assert _zone.attrib["name"] == zone
-        return [parse_record(rr) for rr in _zone.findall("rr")]
+        try:
+            _check_response(response)
+            # Parse records while the body is being received, without
+            # keeping the whole response in memory
+            response.raw.decode_content = True
+            return list(parse_records_stream(response.raw, zone=zone))
+        finally:
+            response.close()
+
+    def records_bulk(
+        self, zones: List[str], service=None, max_workers=8
+    ) -> Dict[str, List[DNSRecord]]:
+        """Get all records for several zones, requesting them in parallel.
+
+        The requests share the connection pool of the session, so
+        `max_workers` should not exceed `pool_maxsize` of this object.
+
+        A token expiring within a minute is refreshed before the requests
+        are started. If it expires during the batch, the threads refresh it
+        one at a time, and only the first of them sends the refresh token.
+
+        Returns:
+            a dict with lists of DNSRecord subclasses objects by zone names.
+        """
+        self._refresh_expiring_token()
+        zones = list(zones)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda zone: self.records(service=service, zone=zone), zones
+            )
+            return dict(zip(zones, results))
 
     def add_record(
         self,
@@ -442,40 +702,36 @@ class DnsApi(object):
         else:
             _records = list(records)
 
-        rr_list = []  # for XML representations
-
-        for record in _records:
-            record_xml = record.to_xml()
-            rr_list.append(record_xml)
-            logger.debug(
-                "Preparing to add a new record on service %s zone %s: %s",
-                service,
-                zone,
-                record_xml,
+        invalid = [r for r in _records if not isinstance(r, DNSRecord)]
+        if invalid:
+            raise TypeError(
+                "Expected DNSRecord instances, got: {}".format(invalid)
             )
 
-        _xml = (
-            '<?xml version="1.0" encoding="UTF-8" ?>'
-            "<request><rr-list>"
-            "{}"
-            "</rr-list></request>"
-        ).format("".join(rr_list))
+        rr_list = [record.to_xml() for record in _records]
 
+        if logger.isEnabledFor(logging.DEBUG):
+            for record_xml in rr_list:
+                logger.debug("Prepared record: %s", record_xml)
+        logger.debug(
+            "Prepared %s records to add on service %s zone %s",
+            len(rr_list),
+            service,
+            zone,
+        )
+
+        _xml = _ADD_RECORDS_XML.format("".join(rr_list)).encode("utf-8")
+
+        # Counters and change flags of services and zones become outdated
+        self._cache.clear()
         response = self._put(
-            "services/{}/zones/{}/records".format(service, zone), data=_xml
+            f"services/{service}/zones/{zone}/records", data=_xml
         )
 
-        if response.status_code != requests.codes.ok:
-            raise_error(response.text)
-            raise DnsApiException(
-                "Failed to add new records:\n{}".format(response.text)
-            )
+        _check_response(response, "Failed to add new records")
 
         logger.info("Successfully added %s records", len(rr_list))
-        data = get_data(response)
-        _zone = data.find("zone")
-        assert _zone.attrib["name"] == zone
-        return [parse_record(rr) for rr in _zone.findall("rr")]
+        return list(_iter_zone_records(response.content, zone))
 
     def delete_record(self, record_id: int, service=None, zone=None) -> None:
         """Deletes record by id."""
@@ -489,42 +745,45 @@ class DnsApi(object):
             zone,
         )
 
+        self._cache.clear()
         response = self._delete(
-            "services/{}/zones/{}/records/{}".format(service, zone, record_id)
+            f"services/{service}/zones/{zone}/records/{record_id}"
         )
 
-        if response.status_code != requests.codes.ok:
-            raise_error(response.text)
-            raise DnsApiException(
-                "Failed to delete record:\n{}".format(response.text)
-            )
+        _check_response(response, "Failed to delete record")
 
         logger.info("Record #%s deleted", record_id)
 
+    def delete_records(
+        self, record_ids: List[int], service=None, zone=None
+    ) -> None:
+        """Deletes records by ids.
+
+        All IDs are validated before the first request is sent: an ID must
+        be an integer or a string of digits. The API does not provide a batch
+        delete method, so records are deleted one by one over the same
+        keep-alive connection. If a request fails, the records deleted before
+        it stay deleted.
+        """
+        _record_ids = [_record_id(record_id) for record_id in record_ids]
+        for record_id in _record_ids:
+            self.delete_record(record_id, service=service, zone=zone)
+        logger.info("Deleted %s records", len(_record_ids))
+
     def commit(self, service=None, zone=None) -> None:
         """Commits changes in zone."""
         service = self.default_service if service is None else service
         zone = self.default_zone if zone is None else zone
-        response = self._post(
-            "services/{}/zones/{}/commit".format(service, zone)
-        )
-        if response.status_code != requests.codes.ok:
-            raise_error(response.text)
-            raise DnsApiException(
-                "Failed to commit changes:\n{}".format(response.text)
-            )
+        self._cache.clear()
+        response = self._post(f"services/{service}/zones/{zone}/commit")
+        _check_response(response, "Failed to commit changes")
         logger.info("Changes committed")
 
     def rollback(self, service=None, zone=None) -> None:
         """Rolls back changes in zone."""
         service = self.default_service if service is None else service
         zone = self.default_zone if zone is None else zone
-        response = self._post(
-            "services/{}/zones/{}/rollback".format(service, zone)
-        )
-        if response.status_code != requests.codes.ok:
-            raise_error(response.text)
-            raise DnsApiException(
-                "Failed to rollback changes:\n{}".format(response.text)
-            )
+        self._cache.clear()
+        response = self._post(f"services/{service}/zones/{zone}/rollback")
+        _check_response(response, "Failed to rollback changes")
         logger.info("Changes are rolled back")
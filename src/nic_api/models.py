@@ -1,12 +1,79 @@
 """nic_api - classes for entities returned by API."""
 
 
+from functools import lru_cache
 from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+import sys
+
+
+def _index_children(elem: ElementTree.Element):
+    """Maps tags of direct children to the child elements in a single pass."""
+    return {child.tag: child for child in elem}
+
+
+def _common_fields(rr: ElementTree.Element, children):
+    """Reads ID, name, IDN name and TTL of a record from its <rr> tag."""
+    ttl = children.get("ttl")
+    return (
+        rr.get("id"),
+        children["name"].text,
+        children["idn-name"].text,
+        ttl.text if ttl is not None else None,
+    )
+
+
+def _slots_dict(obj):
+    """Maps names of set slot attributes of an object to their values."""
+    fields = {}
+    for klass in reversed(type(obj).__mro__):
+        for slot in klass.__dict__.get("__slots__", ()):
+            if hasattr(obj, slot):
+                fields[slot] = getattr(obj, slot)
+    return fields
+
+
+def _intern(value):
+    """Interns a string, so records with the same names share one object."""
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _to_idn(name):
+    """Decodes an ASCII (Punycode) domain name to its IDN form."""
+    if "xn--" not in name.lower():
+        # Labels without the ACE prefix are decoded as is
+        return _intern(name)
+    return _intern(name.encode().decode("idna"))
+
+
+def _xml_text(value):
+    """Escapes a value to be used as a text of an XML element."""
+    if value is None:
+        return ""
+    return escape(str(value))
+
+
+# Python argument names by XML attribute and tag names, filled by _attr_name()
+_ATTR_NAMES = {}
+
+
+def _attr_name(key):
+    """Converts an XML attribute or tag name to a Python argument name."""
+    name = _ATTR_NAMES.get(key)
+    if name is None:
+        name = _ATTR_NAMES[key] = sys.intern(key.replace("-", "_"))
+    return name
+
+
+_BOOLEANS = {"true": True, "false": False}
 
 
 def _strtobool(string):
     """Converts a string from NIC API response to a bool."""
-    return {"true": True, "false": False}[string]
+    return _BOOLEANS[string]
 
 
 def parse_record(rr: ElementTree.Element):
@@ -22,28 +89,52 @@ def parse_record(rr: ElementTree.Element):
         one of SOARecord, NSRecord, ARecord, AAAARecord, CNAMERecord, MXRecord,
         TXTRecord.
     """
-    record_classes = {
-        "SOA": SOARecord,
-        "NS": NSRecord,
-        "A": ARecord,
-        "AAAA": AAAARecord,
-        "CNAME": CNAMERecord,
-        "MX": MXRecord,
-        "TXT": TXTRecord,
-        "SRV": SRVRecord,
-        "PTR": PTRRecord,
-        "DNAME": DNAMERecord,
-        "HINFO": HINFORecord,
-        "NAPTR": NAPTRRecord,
-        "RP": RPRecord,
-    }
-
     record_type = rr.find("type").text
+    from_xml = _RECORD_PARSERS.get(record_type)
 
-    if record_type not in record_classes:
+    if from_xml is None:
         raise TypeError("Unknown record type: {}".format(record_type))
 
-    return record_classes[record_type].from_xml(rr)
+    return from_xml(rr)
+
+
+def parse_records_stream(source, zone=None):
+    """Parses <rr> tags from an XML document one by one.
+
+    Each <rr> tag is cleared and detached from its parent right after it is
+    parsed, so the memory usage does not depend on the number of records.
+
+    Arguments:
+        source: a file name or a binary file object with the XML document;
+        zone: if set, the name that every <zone> tag in the document should
+            have; a document without <zone> tags is rejected as well;
+
+    Returns:
+        an iterator over DNSRecord subclasses objects.
+    """
+    parents = []
+    zone_found = False
+    events = ElementTree.iterparse(source, events=("start", "end"))
+    for event, elem in events:
+        if event == "start":
+            if elem.tag == "zone" and zone is not None:
+                zone_found = True
+                if elem.attrib.get("name") != zone:
+                    raise ValueError(
+                        "Expected zone {}, got: {}".format(
+                            zone, elem.attrib.get("name")
+                        )
+                    )
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag == "rr":
+            yield parse_record(elem)
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+    if zone is not None and not zone_found:
+        raise ValueError("Expected zone {}, got none".format(zone))
 
 
 # *****************************************************************************
@@ -54,6 +145,19 @@ def parse_record(rr: ElementTree.Element):
 class NICService(object):
     """Model of service object."""
 
+    __slots__ = (
+        "admin",
+        "domains_limit",
+        "domains_num",
+        "enable",
+        "has_primary",
+        "name",
+        "payer",
+        "rr_limit",
+        "rr_num",
+        "tariff",
+    )
+
     def __init__(
         self,
         admin,
@@ -81,17 +185,26 @@ class NICService(object):
         self.tariff = tariff
 
     def __repr__(self):
-        return repr(vars(self))
+        return repr(_slots_dict(self))
 
     @classmethod
     def from_xml(cls, service: ElementTree.Element):
         """Alternative constructor - creates an instance of NICService from
         its XML representation.
         """
-        kwargs = {k.replace("-", "_"): v for k, v in service.attrib.items()}
-        kwargs["enable"] = _strtobool(kwargs["enable"])
-        kwargs["has_primary"] = _strtobool(kwargs["has_primary"])
-        return cls(**kwargs)
+        attrib = service.attrib
+        return cls(
+            admin=attrib["admin"],
+            domains_limit=attrib["domains-limit"],
+            domains_num=attrib["domains-num"],
+            enable=_strtobool(attrib["enable"]),
+            has_primary=_strtobool(attrib["has-primary"]),
+            name=attrib["name"],
+            payer=attrib["payer"],
+            tariff=attrib["tariff"],
+            rr_limit=attrib.get("rr-limit"),
+            rr_num=attrib.get("rr-num"),
+        )
 
 
 # *****************************************************************************
@@ -102,6 +215,18 @@ class NICService(object):
 class NICZone(object):
     """Model of zone object."""
 
+    __slots__ = (
+        "admin",
+        "enable",
+        "has_changes",
+        "has_primary",
+        "id",
+        "idn_name",
+        "name",
+        "payer",
+        "service",
+    )
+
     def __init__(
         self,
         admin,
@@ -125,7 +250,7 @@ class NICZone(object):
         self.service = service
 
     def __repr__(self):
-        return repr(vars(self))
+        return repr(_slots_dict(self))
 
     def to_xml(self):
         # TODO: add implementation if needed
@@ -136,15 +261,18 @@ class NICZone(object):
         """Alternative constructor - creates an instance of NICZone from
         its XML representation.
         """
-        kwargs = {k.replace("-", "_"): v for k, v in zone.attrib.items()}
-
-        kwargs["id_"] = kwargs["id"]
-        kwargs.pop("id")
-
-        kwargs["enable"] = _strtobool(kwargs["enable"])
-        kwargs["has_changes"] = _strtobool(kwargs["has_changes"])
-        kwargs["has_primary"] = _strtobool(kwargs["has_primary"])
-        return cls(**kwargs)
+        attrib = zone.attrib
+        return cls(
+            admin=attrib["admin"],
+            enable=_strtobool(attrib["enable"]),
+            has_changes=_strtobool(attrib["has-changes"]),
+            has_primary=_strtobool(attrib["has-primary"]),
+            id_=attrib["id"],
+            idn_name=attrib["idn-name"],
+            name=attrib["name"],
+            payer=attrib["payer"],
+            service=attrib["service"],
+        )
 
 
 # *****************************************************************************
@@ -155,13 +283,70 @@ class NICZone(object):
 # an ElementTree.Element.
 #
 # Each model has to_xml() method that returns (str) an XML representation
-# of the current record.
+# of the current record. The representation is rendered from the templates
+# below rather than built as an ElementTree, as the schemas are fixed. Only
+# text fields are escaped, numeric fields are already converted by int().
 #
 
+_RR_XML = "<rr{id}><name>{name}</name>{ttl}<type>{type}</type>{content}</rr>"
+_SOA_XML = (
+    "<soa>"
+    "<mname><name>{mname}</name></mname>"
+    "<rname><name>{rname}</name></rname>"
+    "<serial>{serial}</serial>"
+    "<refresh>{refresh}</refresh>"
+    "<retry>{retry}</retry>"
+    "<expire>{expire}</expire>"
+    "<minimum>{minimum}</minimum>"
+    "</soa>"
+)
+_NS_XML = "<ns><name>{}</name></ns>"
+_A_XML = "<a>{}</a>"
+_AAAA_XML = "<aaaa>{}</aaaa>"
+_CNAME_XML = "<cname><name>{}</name></cname>"
+_MX_XML = (
+    "<mx>"
+    "<preference>{preference}</preference>"
+    "<exchange><name>{exchange}</name></exchange>"
+    "</mx>"
+)
+_TXT_XML = "<txt>{}</txt>"
+_TXT_STRING_XML = "<string>{}</string>"
+_SRV_XML = (
+    "<srv>"
+    "<priority>{priority}</priority>"
+    "<weight>{weight}</weight>"
+    "<port>{port}</port>"
+    "<target><name>{target}</name></target>"
+    "</srv>"
+)
+_PTR_XML = "<ptr><name>{}</name></ptr>"
+_DNAME_XML = "<dname><name>{}</name></dname>"
+_HINFO_XML = "<hinfo><hardware>{hardware}</hardware><os>{os}</os></hinfo>"
+_NAPTR_XML = (
+    "<naptr>"
+    "<order>{order}</order>"
+    "<preference>{preference}</preference>"
+    "<flags>{flags}</flags>"
+    "<service>{service}</service>"
+    "<regexp>{regexp}</regexp>"
+    "<replacement><name>{replacement}</name></replacement>"
+    "</naptr>"
+)
+_RP_XML = (
+    "<rp>"
+    "<mbox-dname><name>{mbox}</name></mbox-dname>"
+    "<txt-dname><name>{txt}</name></txt-dname>"
+    "</rp>"
+)
+
 
 class DNSRecord(object):
     """Base model of NIC.RU DNS record."""
 
+    __slots__ = ("id", "name", "idn_name")
+
+    # Overridden by the "ttl" slot in the models of records that have a TTL
     ttl = None
 
     def __init__(self, id_=None, name="", idn_name=None):
@@ -171,18 +356,18 @@ class DNSRecord(object):
             self.id = int(id_)
         if self.id == 0:
             raise ValueError("Invalid record ID")
-        if name is not None and not name.isascii():
+        if name and not name.isascii():
             raise ValueError("Name should be an ASCII string")
-        self.name = name
+        self.name = _intern(name)
         if idn_name is not None:
-            self.idn_name = idn_name
-        elif name is not None:
-            self.idn_name = name.encode().decode("idna")
+            self.idn_name = _intern(idn_name)
+        elif name:
+            self.idn_name = _to_idn(name)
         else:
             self.idn_name = name
 
     def __repr__(self):
-        return repr(vars(self))
+        return repr(_slots_dict(self))
 
     @property
     def record_type(self):
@@ -199,14 +384,47 @@ class DNSRecord(object):
         ElementTree.SubElement(root, "type").text = self.record_type
         return root
 
+    def _render_xml(self, content):
+        """Wraps the record type specific XML content into the <rr> tag."""
+        return _RR_XML.format(
+            id=' id="{}"'.format(self.id) if self.id else "",
+            name=_xml_text(self.name),
+            ttl=(
+                "<ttl>{}</ttl>".format(self.ttl) if self.ttl is not None else ""
+            ),
+            type=self.record_type,
+            content=content,
+        )
+
 
 class SOARecord(DNSRecord):
     """Model of SOA record."""
 
+    record_type = "SOA"
+    __slots__ = (
+        "serial",
+        "refresh",
+        "retry",
+        "expire",
+        "minimum",
+        "mname",
+        "rname",
+    )
+
     def __init__(
-        self, serial, refresh, retry, expire, minimum, mname, rname, **kwargs
+        self,
+        serial,
+        refresh,
+        retry,
+        expire,
+        minimum,
+        mname,
+        rname,
+        id_=None,
+        name="",
+        idn_name=None,
     ):
-        super(SOARecord, self).__init__(**kwargs)
+        DNSRecord.__init__(self, id_, name, idn_name)
         self.serial = int(serial)
         self.refresh = int(refresh)
         self.retry = int(retry)
@@ -215,247 +433,222 @@ class SOARecord(DNSRecord):
         self.mname = DNSRecord(**mname)
         self.rname = DNSRecord(**rname)
 
-    @property
-    def record_type(self):
-        return "SOA"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _soa = ElementTree.SubElement(root, "soa")
-        _mname = ElementTree.SubElement(_soa, "mname")
-        ElementTree.SubElement(_mname, "name").text = self.mname.name
-        _rname = ElementTree.SubElement(_soa, "rname")
-        ElementTree.SubElement(_rname, "name").text = self.rname.name
-        ElementTree.SubElement(_soa, "serial").text = str(self.serial)
-        ElementTree.SubElement(_soa, "refresh").text = str(self.refresh)
-        ElementTree.SubElement(_soa, "retry").text = str(self.retry)
-        ElementTree.SubElement(_soa, "expire").text = str(self.expire)
-        ElementTree.SubElement(_soa, "minimum").text = str(self.minimum)
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(
+            _SOA_XML.format(
+                mname=_xml_text(self.mname.name),
+                rname=_xml_text(self.rname.name),
+                serial=self.serial,
+                refresh=self.refresh,
+                retry=self.retry,
+                expire=self.expire,
+                minimum=self.minimum,
+            )
+        )
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of SOARecord from
         its XML representation.
         """
-        if rr.find("type").text != "SOA":
+        children = _index_children(rr)
+        if children["type"].text != "SOA":
             raise ValueError("Record is not an SOA record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        soa_fields = {
-            elem: rr.find("soa/" + elem).text
-            for elem in ("serial", "refresh", "retry", "expire", "minimum")
-        }
-        soa_fields["mname"] = {
-            elem.tag.replace("-", "_"): elem.text
-            for elem in rr.findall("soa/mname/*")
-        }
-        soa_fields["rname"] = {
-            elem.tag.replace("-", "_"): elem.text
-            for elem in rr.findall("soa/rname/*")
-        }
-        return cls(id_=id_, name=name, idn_name=idn_name, **soa_fields)
+        id_ = rr.get("id")
+        name = children["name"].text
+        idn_name = children["idn-name"].text
+        soa = _index_children(children["soa"])
+        mname = {_attr_name(elem.tag): elem.text for elem in soa["mname"]}
+        rname = {_attr_name(elem.tag): elem.text for elem in soa["rname"]}
+        return cls(
+            id_=id_,
+            name=name,
+            idn_name=idn_name,
+            serial=soa["serial"].text,
+            refresh=soa["refresh"].text,
+            retry=soa["retry"].text,
+            expire=soa["expire"].text,
+            minimum=soa["minimum"].text,
+            mname=mname,
+            rname=rname,
+        )
 
 
 class NSRecord(DNSRecord):
     """Model of NS record."""
 
-    def __init__(self, ns, **kwargs):
-        super(NSRecord, self).__init__(**kwargs)
-        self.ns = ns
+    record_type = "NS"
+    __slots__ = ("ns",)
 
-    @property
-    def record_type(self):
-        return "NS"
+    def __init__(self, ns, id_=None, name="", idn_name=None):
+        DNSRecord.__init__(self, id_, name, idn_name)
+        self.ns = _intern(ns)
 
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _ns = ElementTree.SubElement(root, "ns")
-        ElementTree.SubElement(_ns, "name").text = self.ns
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(_NS_XML.format(_xml_text(self.ns)))
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of NSRecord from
         its XML representation.
         """
-        if rr.find("type").text != "NS":
+        children = _index_children(rr)
+        if children["type"].text != "NS":
             raise ValueError("Record is not an NS record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        ns = rr.find("ns/name").text
+        id_ = rr.get("id")
+        name = children["name"].text
+        idn_name = children["idn-name"].text
+        ns = children["ns"].find("name").text
         return cls(id_=id_, name=name, idn_name=idn_name, ns=ns)
 
 
 class ARecord(DNSRecord):
     """Model of A record."""
 
-    ttl = None
+    record_type = "A"
+    __slots__ = ("ttl", "a")
 
-    def __init__(self, a, ttl=None, **kwargs):
-        super(ARecord, self).__init__(**kwargs)
+    def __init__(self, a, ttl=None, id_=None, name="", idn_name=None):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.a = a
 
-    @property
-    def record_type(self):
-        return "A"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        ElementTree.SubElement(root, "a").text = self.a
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(_A_XML.format(_xml_text(self.a)))
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of ARecord from
         its XML representation.
         """
-        if rr.find("type").text != "A":
+        children = _index_children(rr)
+        if children["type"].text != "A":
             raise ValueError("Record is not an A record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        a = rr.find("a").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        a = children["a"].text
         return cls(id_=id_, name=name, idn_name=idn_name, ttl=ttl, a=a)
 
 
 class AAAARecord(DNSRecord):
     """Model of AAAA record."""
 
-    ttl = None
+    record_type = "AAAA"
+    __slots__ = ("ttl", "aaaa")
 
-    def __init__(self, aaaa, ttl=None, **kwargs):
-        super(AAAARecord, self).__init__(**kwargs)
+    def __init__(self, aaaa, ttl=None, id_=None, name="", idn_name=None):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.aaaa = aaaa
 
-    @property
-    def record_type(self):
-        return "AAAA"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        ElementTree.SubElement(root, "aaaa").text = self.aaaa
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(_AAAA_XML.format(_xml_text(self.aaaa)))
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of AAAARecord from
         its XML representation.
         """
-        if rr.find("type").text != "AAAA":
+        children = _index_children(rr)
+        if children["type"].text != "AAAA":
             raise ValueError("Record is not an AAAA record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        aaaa = rr.find("aaaa").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        aaaa = children["aaaa"].text
         return cls(id_=id_, name=name, idn_name=idn_name, ttl=ttl, aaaa=aaaa)
 
 
 class CNAMERecord(DNSRecord):
     """Model of CNAME record."""
 
-    ttl = None
+    record_type = "CNAME"
+    __slots__ = ("ttl", "cname")
 
-    def __init__(self, cname, ttl=None, **kwargs):
-        super(CNAMERecord, self).__init__(**kwargs)
+    def __init__(self, cname, ttl=None, id_=None, name="", idn_name=None):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
-        self.cname = cname
-
-    @property
-    def record_type(self):
-        return "CNAME"
+        else:
+            self.ttl = None
+        self.cname = _intern(cname)
 
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _cname = ElementTree.SubElement(root, "cname")
-        ElementTree.SubElement(_cname, "name").text = self.cname
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(_CNAME_XML.format(_xml_text(self.cname)))
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of CNAMERecord from
         its XML representation.
         """
-        if rr.find("type").text != "CNAME":
+        children = _index_children(rr)
+        if children["type"].text != "CNAME":
             raise ValueError("Record is not a CNAME record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        cname = rr.find("cname/name").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        cname = children["cname"].find("name").text
         return cls(id_=id_, name=name, idn_name=idn_name, ttl=ttl, cname=cname)
 
 
 class MXRecord(DNSRecord):
     """Model of MX record."""
 
-    ttl = None
+    record_type = "MX"
+    __slots__ = ("ttl", "preference", "exchange")
 
-    def __init__(self, preference, exchange, ttl=None, **kwargs):
-        super(MXRecord, self).__init__(**kwargs)
+    def __init__(
+        self, preference, exchange, ttl=None, id_=None, name="", idn_name=None
+    ):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.preference = int(preference)
-        self.exchange = exchange
-
-    @property
-    def record_type(self):
-        return "MX"
+        self.exchange = _intern(exchange)
 
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _mx = ElementTree.SubElement(root, "mx")
-        ElementTree.SubElement(_mx, "preference").text = str(self.preference)
-        _exchange = ElementTree.SubElement(_mx, "exchange")
-        ElementTree.SubElement(_exchange, "name").text = str(self.exchange)
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(
+            _MX_XML.format(
+                preference=self.preference,
+                exchange=_xml_text(self.exchange),
+            )
+        )
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of MXRecord from
         its XML representation.
         """
-        if rr.find("type").text != "MX":
+        children = _index_children(rr)
+        if children["type"].text != "MX":
             raise ValueError("Record is not an MX record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        preference = rr.find("mx/preference").text
-        exchange = rr.find("mx/exchange/name").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        mx = _index_children(children["mx"])
+        preference = mx["preference"].text
+        exchange = mx["exchange"].find("name").text
         return cls(
             id_=id_,
             name=name,
@@ -469,41 +662,44 @@ class MXRecord(DNSRecord):
 class TXTRecord(DNSRecord):
     """Model of TXT record."""
 
-    ttl = None
+    record_type = "TXT"
+    __slots__ = ("ttl", "txt")
 
-    def __init__(self, txt, ttl=None, **kwargs):
-        super(TXTRecord, self).__init__(**kwargs)
+    def __init__(self, txt, ttl=None, id_=None, name="", idn_name=None):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.txt = txt
 
-    @property
-    def record_type(self):
-        return "TXT"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _txt = ElementTree.SubElement(root, "txt")
-        ElementTree.SubElement(_txt, "string").text = self.txt
-        return ElementTree.tostring(root, encoding="unicode")
+        strings = (
+            self.txt if isinstance(self.txt, (list, tuple)) else [self.txt]
+        )
+        return self._render_xml(
+            _TXT_XML.format(
+                "".join(
+                    _TXT_STRING_XML.format(_xml_text(string))
+                    for string in strings
+                )
+            )
+        )
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of TXTRecord from
         its XML representation.
         """
-        if rr.find("type").text != "TXT":
+        children = _index_children(rr)
+        if children["type"].text != "TXT":
             raise ValueError("Record is not a TXT record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        txt = [string.text for string in rr.findall("txt/string")]
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        txt = [string.text for string in children["txt"].findall("string")]
         if len(txt) == 1:
             txt = txt[0]
         return cls(id_=id_, name=name, idn_name=idn_name, ttl=ttl, txt=txt)
@@ -512,51 +708,58 @@ class TXTRecord(DNSRecord):
 class SRVRecord(DNSRecord):
     """Model of SRV record."""
 
-    ttl = None
+    record_type = "SRV"
+    __slots__ = ("ttl", "priority", "weight", "port", "target")
 
-    def __init__(self, priority, weight, port, target, ttl=None, **kwargs):
-        super(SRVRecord, self).__init__(**kwargs)
+    def __init__(
+        self,
+        priority,
+        weight,
+        port,
+        target,
+        ttl=None,
+        id_=None,
+        name="",
+        idn_name=None,
+    ):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.priority = int(priority)
         self.weight = int(weight)
         self.port = int(port)
-        self.target = target
-
-    @property
-    def record_type(self):
-        return "SRV"
+        self.target = _intern(target)
 
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _srv = ElementTree.SubElement(root, "srv")
-        ElementTree.SubElement(_srv, "priority").text = str(self.priority)
-        ElementTree.SubElement(_srv, "weight").text = str(self.weight)
-        ElementTree.SubElement(_srv, "port").text = str(self.port)
-        _target = ElementTree.SubElement(_srv, "target")
-        ElementTree.SubElement(_target, "name").text = str(self.target)
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(
+            _SRV_XML.format(
+                priority=self.priority,
+                weight=self.weight,
+                port=self.port,
+                target=_xml_text(self.target),
+            )
+        )
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of SRVRecord from
         its XML representation.
         """
-        if rr.find("type").text != "SRV":
+        children = _index_children(rr)
+        if children["type"].text != "SRV":
             raise ValueError("Record is not an SRV record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        priority = rr.find("srv/priority").text
-        weight = rr.find("srv/weight").text
-        port = rr.find("srv/port").text
-        target = rr.find("srv/target/name").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        srv = _index_children(children["srv"])
+        priority = srv["priority"].text
+        weight = srv["weight"].text
+        port = srv["port"].text
+        target = srv["target"].find("name").text
         return cls(
             id_=id_,
             name=name,
@@ -572,126 +775,111 @@ class SRVRecord(DNSRecord):
 class PTRRecord(DNSRecord):
     """Model of PTR record."""
 
-    ttl = None
+    record_type = "PTR"
+    __slots__ = ("ttl", "ptr")
 
-    def __init__(self, ptr, ttl=None, **kwargs):
-        super(PTRRecord, self).__init__(**kwargs)
+    def __init__(self, ptr, ttl=None, id_=None, name="", idn_name=None):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.ptr = ptr
 
-    @property
-    def record_type(self):
-        return "PTR"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _ptr = ElementTree.SubElement(root, "ptr")
-        ElementTree.SubElement(_ptr, "name").text = self.ptr
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(_PTR_XML.format(_xml_text(self.ptr)))
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of PTRRecord from
         its XML representation.
         """
-        if rr.find("type").text != "PTR":
+        children = _index_children(rr)
+        if children["type"].text != "PTR":
             raise ValueError("Record is not a PTR record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        ptr = rr.find("ptr/name").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        ptr = children["ptr"].find("name").text
         return cls(id_=id_, name=name, idn_name=idn_name, ttl=ttl, ptr=ptr)
 
 
 class DNAMERecord(DNSRecord):
     """Model of DNAME record."""
 
-    ttl = None
+    record_type = "DNAME"
+    __slots__ = ("ttl", "dname")
 
-    def __init__(self, dname, ttl=None, **kwargs):
-        super(DNAMERecord, self).__init__(**kwargs)
+    def __init__(self, dname, ttl=None, id_=None, name="", idn_name=None):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.dname = dname
 
-    @property
-    def record_type(self):
-        return "DNAME"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _dname = ElementTree.SubElement(root, "dname")
-        ElementTree.SubElement(_dname, "name").text = self.dname
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(_DNAME_XML.format(_xml_text(self.dname)))
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of DNAMERecord from
         its XML representation.
         """
-        if rr.find("type").text != "DNAME":
+        children = _index_children(rr)
+        if children["type"].text != "DNAME":
             raise ValueError("Record is not a DNAME record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        dname = rr.find("dname/name").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        dname = children["dname"].find("name").text
         return cls(id_=id_, name=name, idn_name=idn_name, ttl=ttl, dname=dname)
 
 
 class HINFORecord(DNSRecord):
     """Model of HINFO record."""
 
-    ttl = None
+    record_type = "HINFO"
+    __slots__ = ("ttl", "hardware", "os")
 
-    def __init__(self, hardware, os, ttl=None, **kwargs):
-        super(HINFORecord, self).__init__(**kwargs)
+    def __init__(
+        self, hardware, os, ttl=None, id_=None, name="", idn_name=None
+    ):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.hardware = hardware
         self.os = os
 
-    @property
-    def record_type(self):
-        return "HINFO"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _hinfo = ElementTree.SubElement(root, "hinfo")
-        ElementTree.SubElement(_hinfo, "hardware").text = self.hardware
-        ElementTree.SubElement(_hinfo, "os").text = self.os
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(
+            _HINFO_XML.format(
+                hardware=_xml_text(self.hardware), os=_xml_text(self.os)
+            )
+        )
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of HINFORecord from
         its XML representation.
         """
-        if rr.find("type").text != "HINFO":
+        children = _index_children(rr)
+        if children["type"].text != "HINFO":
             raise ValueError("Record is not an HINFO record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        hardware = rr.find("hinfo/hardware").text
-        os = rr.find("hinfo/os").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        hinfo = _index_children(children["hinfo"])
+        hardware = hinfo["hardware"].text
+        os = hinfo["os"].text
         return cls(
             id_=id_,
             name=name,
@@ -705,7 +893,16 @@ class HINFORecord(DNSRecord):
 class NAPTRRecord(DNSRecord):
     """Model of NAPTR record."""
 
-    ttl = None
+    record_type = "NAPTR"
+    __slots__ = (
+        "ttl",
+        "order",
+        "preference",
+        "flags",
+        "service",
+        "regexp",
+        "replacement",
+    )
 
     def __init__(
         self,
@@ -716,13 +913,17 @@ class NAPTRRecord(DNSRecord):
         regexp="",
         replacement="",
         ttl=None,
-        **kwargs,
+        id_=None,
+        name="",
+        idn_name=None,
     ):
-        super(NAPTRRecord, self).__init__(**kwargs)
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.order = int(order)
         self.preference = int(preference)
         self.flags = flags
@@ -730,42 +931,36 @@ class NAPTRRecord(DNSRecord):
         self.regexp = regexp
         self.replacement = replacement
 
-    @property
-    def record_type(self):
-        return "NAPTR"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _naptr = ElementTree.SubElement(root, "naptr")
-        ElementTree.SubElement(_naptr, "order").text = str(self.order)
-        ElementTree.SubElement(_naptr, "preference").text = str(self.preference)
-        ElementTree.SubElement(_naptr, "flags").text = self.flags
-        ElementTree.SubElement(_naptr, "service").text = self.service
-        ElementTree.SubElement(_naptr, "regexp").text = self.regexp
-        _replacement = ElementTree.SubElement(_naptr, "replacement")
-        ElementTree.SubElement(_replacement, "name").text = self.replacement
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(
+            _NAPTR_XML.format(
+                order=self.order,
+                preference=self.preference,
+                flags=_xml_text(self.flags),
+                service=_xml_text(self.service),
+                regexp=_xml_text(self.regexp),
+                replacement=_xml_text(self.replacement),
+            )
+        )
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of NAPTRRecord from
         its XML representation.
         """
-        if rr.find("type").text != "NAPTR":
+        children = _index_children(rr)
+        if children["type"].text != "NAPTR":
             raise ValueError("Record is not an NAPTR record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        order = rr.find("naptr/order").text
-        preference = rr.find("naptr/preference").text
-        flags = rr.find("naptr/flags").text
-        service = rr.find("naptr/service").text
-        regexp = rr.find("naptr/regexp").text
-        replacement = rr.find("naptr/replacement/name").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        naptr = _index_children(children["naptr"])
+        order = naptr["order"].text
+        preference = naptr["preference"].text
+        flags = naptr["flags"].text
+        service = naptr["service"].text
+        regexp = naptr["regexp"].text
+        replacement = naptr["replacement"].find("name").text
         return cls(
             id_=id_,
             name=name,
@@ -783,46 +978,39 @@ class NAPTRRecord(DNSRecord):
 class RPRecord(DNSRecord):
     """Model of RP record."""
 
-    ttl = None
+    record_type = "RP"
+    __slots__ = ("ttl", "mbox", "txt")
 
-    def __init__(self, mbox, txt, ttl=None, **kwargs):
-        super(RPRecord, self).__init__(**kwargs)
+    def __init__(self, mbox, txt, ttl=None, id_=None, name="", idn_name=None):
+        DNSRecord.__init__(self, id_, name, idn_name)
         if ttl is not None:
             self.ttl = int(ttl)
             if self.ttl == 0:
                 raise ValueError("Invalid TTL")
+        else:
+            self.ttl = None
         self.mbox = mbox
         self.txt = txt
 
-    @property
-    def record_type(self):
-        return "RP"
-
     def to_xml(self):
         """Returns an XML representation of record object."""
-        root = self.as_etree
-        _rp = ElementTree.SubElement(root, "rp")
-        _mbox = ElementTree.SubElement(_rp, "mbox-dname")
-        ElementTree.SubElement(_mbox, "name").text = self.mbox
-        _txt = ElementTree.SubElement(_rp, "txt-dname")
-        ElementTree.SubElement(_txt, "name").text = self.txt
-        return ElementTree.tostring(root, encoding="unicode")
+        return self._render_xml(
+            _RP_XML.format(mbox=_xml_text(self.mbox), txt=_xml_text(self.txt))
+        )
 
     @classmethod
     def from_xml(cls, rr: ElementTree.Element):
         """Alternative constructor - creates an instance of RPRecord from
         its XML representation.
         """
-        if rr.find("type").text != "RP":
+        children = _index_children(rr)
+        if children["type"].text != "RP":
             raise ValueError("Record is not an HINFO record")
 
-        id_ = rr.attrib["id"] if "id" in rr.attrib else None
-        name = rr.find("name").text
-        idn_name = rr.find("idn-name").text
-        elem_ttl = rr.find("ttl")
-        ttl = elem_ttl.text if elem_ttl is not None else None
-        mbox = rr.find("rp/mbox-dname/name").text
-        txt = rr.find("rp/txt-dname/name").text
+        id_, name, idn_name, ttl = _common_fields(rr, children)
+        rp = _index_children(children["rp"])
+        mbox = rp["mbox-dname"].find("name").text
+        txt = rp["txt-dname"].find("name").text
         return cls(
             id_=id_,
             name=name,
@@ -831,3 +1019,22 @@ class RPRecord(DNSRecord):
             mbox=mbox,
             txt=txt,
         )
+
+
+# Alternative constructors of record models by record type, used by
+# parse_record()
+_RECORD_PARSERS = {
+    "SOA": SOARecord.from_xml,
+    "NS": NSRecord.from_xml,
+    "A": ARecord.from_xml,
+    "AAAA": AAAARecord.from_xml,
+    "CNAME": CNAMERecord.from_xml,
+    "MX": MXRecord.from_xml,
+    "TXT": TXTRecord.from_xml,
+    "SRV": SRVRecord.from_xml,
+    "PTR": PTRRecord.from_xml,
+    "DNAME": DNAMERecord.from_xml,
+    "HINFO": HINFORecord.from_xml,
+    "NAPTR": NAPTRRecord.from_xml,
+    "RP": RPRecord.from_xml,
+}
@@ -0,0 +1,353 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import json
+import os
+import time
+
+from urllib3.response import HTTPResponse
+import pytest
+import requests
+
+from nic_api import DnsApi, _iter_zone_records, clear_token_cache, raise_error
+from nic_api.exceptions import ZoneNotFound
+from nic_api.models import ARecord, CNAMERecord
+
+
+RECORDS_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8" ?>
+<response>
+<status>success</status>
+<data>
+<zone admin="123/NIC-REG" has-changes="false" id="228095" idn-name="test.ru"
+ name="test.ru" service="testservice">
+<rr id="210074">
+<name>@</name>
+<idn-name>@</idn-name>
+<type>A</type>
+<a>192.168.0.1</a>
+</rr>
+<rr id="210075">
+<name>www</name>
+<idn-name>www</idn-name>
+<ttl>3600</ttl>
+<type>CNAME</type>
+<cname><name>@</name></cname>
+</rr>
+</zone>
+</data>
+</response>
+"""
+
+
+def test_iter_zone_records():
+    records = list(_iter_zone_records(RECORDS_RESPONSE, "test.ru"))
+    assert len(records) == 2
+    assert isinstance(records[0], ARecord)
+    assert records[0].id == 210074
+    assert records[0].a == "192.168.0.1"
+    assert isinstance(records[1], CNAMERecord)
+    assert records[1].ttl == 3600
+    assert records[1].cname == "@"
+
+
+def test_raise_error_from_bytes():
+    error_xml = (
+        '<?xml version="1.0" encoding="UTF-8" ?>'
+        "<response><status>fail</status><errors>"
+        '<error code="4028">Zone not found</error>'
+        "</errors></response>"
+    ).encode()
+    with pytest.raises(ZoneNotFound):
+        raise_error(error_xml)
+
+
+def test_records_streamed(monkeypatch):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = HTTPResponse(
+        body=BytesIO(RECORDS_RESPONSE), status=200, preload_content=False
+    )
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(api, "_get", lambda url, stream=False: response)
+    records = api.records(service="testservice", zone="test.ru")
+    assert [record.id for record in records] == [210074, 210075]
+    assert response.raw.closed
+
+
+def test_zonefile_charset(monkeypatch):
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = "windows-1251"
+    response._content = "; зона\n@ IN A 192.168.0.1\n".encode("cp1251")
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(api, "_get", lambda url, stream=False: response)
+    assert api.zonefile(service="testservice", zone="test.ru") == (
+        "; зона\n@ IN A 192.168.0.1\n"
+    )
+
+
+def test_records_bulk(monkeypatch):
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(
+        api, "records", lambda service=None, zone=None: [service, zone]
+    )
+    assert api.records_bulk(["a.ru", "b.ru"], service="testservice") == {
+        "a.ru": ["testservice", "a.ru"],
+        "b.ru": ["testservice", "b.ru"],
+    }
+
+
+def test_records_bulk_refreshes_token_once(monkeypatch):
+    token = {
+        "access_token": "expired",
+        "refresh_token": "dummy",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expires_at": time.time() - 10,
+    }
+    api = DnsApi("dummy", "dummy", token=token)
+    refreshed = []
+
+    def refresh_token(refresh_token):
+        refreshed.append(refresh_token)
+        api._session.token = dict(token, expires_at=time.time() + 3600)
+
+    monkeypatch.setattr(api, "refresh_token", refresh_token)
+    monkeypatch.setattr(api, "records", lambda service=None, zone=None: [])
+    api.records_bulk(["a.ru", "b.ru", "c.ru"])
+    assert refreshed == ["dummy"]
+
+
+def test_delete_records(monkeypatch):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = (
+        b'<?xml version="1.0" encoding="UTF-8" ?>'
+        b"<response><status>success</status></response>"
+    )
+    deleted = []
+
+    def delete(url):
+        deleted.append(url)
+        return response
+
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(api, "_delete", delete)
+    api.delete_records([210074, "210075"], "testservice", "test.ru")
+    assert deleted == [
+        "services/testservice/zones/test.ru/records/210074",
+        "services/testservice/zones/test.ru/records/210075",
+    ]
+
+    for invalid_id in ("www", "-1", 1.9, True, None):
+        with pytest.raises((TypeError, ValueError)):
+            api.delete_records([210074, invalid_id], "testservice", "test.ru")
+    assert len(deleted) == 2
+
+
+class _RecordsAdapter(requests.adapters.BaseAdapter):
+    """Answers every request with the records of the requested zone."""
+
+    def send(self, request, **kwargs):
+        zone = request.url.split("/zones/")[1].split("/")[0]
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = HTTPResponse(
+            body=BytesIO(RECORDS_RESPONSE.replace(b"test.ru", zone.encode())),
+            status=200,
+            preload_content=False,
+        )
+        return response
+
+    def close(self):
+        pass
+
+
+def test_expired_token_refreshed_once(monkeypatch):
+    expired_token = {
+        "access_token": "expired",
+        "refresh_token": "dummy",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expires_at": time.time() - 10,
+    }
+    api = DnsApi("dummy", "dummy", token=expired_token)
+    api._session.mount("https://", _RecordsAdapter())
+    refreshed = []
+
+    def refresh_token(token_url, refresh_token=None, **kwargs):
+        refreshed.append(refresh_token)
+        # Give the other worker time to hit the expired token as well
+        time.sleep(0.1)
+        api._session.token = dict(
+            expired_token, access_token="dummy", expires_at=time.time() + 3600
+        )
+        return api._session.token
+
+    monkeypatch.setattr(api._session, "refresh_token", refresh_token)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(
+            executor.map(
+                lambda zone: api.records(service="testservice", zone=zone),
+                ["a.ru", "b.ru"],
+            )
+        )
+    assert [len(records) for records in results] == [2, 2]
+    assert refreshed == ["dummy"]
+    assert api._token["access_token"] == "dummy"
+
+
+def test_token_cache(tmp_path):
+    cache_path = tmp_path / "token.json"
+    token = {
+        "access_token": "dummy",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expires_at": time.time() + 3600,
+    }
+    api = DnsApi("dummy", "dummy", token_cache_path=str(cache_path))
+    assert api._token is None
+    api._token_updater(token)
+    assert json.loads(cache_path.read_text()) == token
+
+    api = DnsApi("dummy", "dummy", token_cache_path=str(cache_path))
+    assert api._token == token
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions only")
+def test_token_cache_permissions(tmp_path):
+    cache_path = tmp_path / "token.json"
+    cache_path.write_text("{}")
+    cache_path.chmod(0o644)
+    api = DnsApi("dummy", "dummy", token_cache_path=str(cache_path))
+    api._token_updater({"access_token": "dummy"})
+    assert cache_path.stat().st_mode & 0o777 == 0o600
+    assert json.loads(cache_path.read_text()) == {"access_token": "dummy"}
+    assert [path.name for path in tmp_path.iterdir()] == ["token.json"]
+
+
+def test_token_cache_expired(tmp_path):
+    cache_path = tmp_path / "token.json"
+    cache_path.write_text(
+        json.dumps(
+            {
+                "access_token": "dummy",
+                "token_type": "Bearer",
+                "expires_in": 3600,
+                "expires_at": time.time() - 10,
+            }
+        )
+    )
+    api = DnsApi("dummy", "dummy", token_cache_path=str(cache_path))
+    assert api._token is None
+
+
+def test_token_reused(monkeypatch):
+    token = {
+        "access_token": "dummy",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expires_at": time.time() + 3600,
+    }
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(api._session, "fetch_token", lambda **kwargs: token)
+    api.get_token("user", "password")
+
+    def fetch_token(**kwargs):
+        raise AssertionError("Token should be reused")
+
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(api._session, "fetch_token", fetch_token)
+    try:
+        api.get_token("user", "password")
+        assert api._token == token
+    finally:
+        clear_token_cache()
+
+
+def test_token_relogin_after_rejection(monkeypatch):
+    tokens = [
+        {
+            "access_token": access_token,
+            "token_type": "Bearer",
+            "expires_in": 3600,
+            "expires_at": time.time() + 3600,
+        }
+        for access_token in ("rejected", "dummy")
+    ]
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(
+        api._session, "fetch_token", lambda **kwargs: tokens.pop(0)
+    )
+    try:
+        api.get_token("user", "password")
+        assert api._token["access_token"] == "rejected"
+        # The API rejected the token before its expiry, log in again
+        api.get_token("user", "password")
+        assert api._token["access_token"] == "dummy"
+
+        # Another application secret does not get the cached token
+        api = DnsApi("dummy", "other")
+        monkeypatch.setattr(
+            api._session,
+            "fetch_token",
+            lambda **kwargs: {"access_token": "other", "token_type": "Bearer"},
+        )
+        api.get_token("user", "password")
+        assert api._token["access_token"] == "other"
+    finally:
+        clear_token_cache()
+
+
+def test_expired_token_not_reused(monkeypatch):
+    expired_token = {
+        "access_token": "expired",
+        "refresh_token": "dummy",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expires_at": time.time() - 10,
+    }
+    token = dict(expired_token, access_token="dummy")
+    token["expires_at"] = time.time() + 3600
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(
+        api._session, "fetch_token", lambda **kwargs: expired_token
+    )
+    api.get_token("user", "password")
+
+    api = DnsApi("dummy", "dummy")
+    monkeypatch.setattr(api._session, "fetch_token", lambda **kwargs: token)
+    try:
+        api.get_token("user", "password")
+        assert api._token == token
+    finally:
+        clear_token_cache()
+
+
+def test_services_cached(monkeypatch):
+    services_response = requests.Response()
+    services_response.status_code = 200
+    services_response._content = b"""<?xml version="1.0" encoding="UTF-8" ?>
+<response>
+<status>success</status>
+<data>
+<service admin="123/NIC-REG" domains-limit="12" domains-num="5"
+ enable="true" has-primary="false" name="testservice" payer="123/NIC-REG"
+ tariff="Secondary L" rr-limit="7200" rr-num="139"/>
+</data>
+</response>
+"""
+    requested = []
+
+    def get(url, stream=False):
+        requested.append(url)
+        return services_response
+
+    api = DnsApi("dummy", "dummy", cache_ttl=300)
+    monkeypatch.setattr(api, "_get", get)
+    assert api.services()[0].name == "testservice"
+    assert api.services()[0].rr_num == 139
+    assert requested == ["services"]
+
+    api._cache.clear()
+    api.services()
+    assert requested == ["services", "services"]
@@ -1,7 +1,12 @@
+from io import BytesIO
 from xml.etree import ElementTree
 
+import pytest
+
 from nic_api.models import (
+    _RECORD_PARSERS,
     parse_record,
+    parse_records_stream,
     SOARecord,
     NSRecord,
     ARecord,
@@ -20,7 +25,7 @@ from nic_api.models import (
 
 def _parse_record_nonstrict(xml_string: str) -> ElementTree.Element:
     rr = ElementTree.fromstring(xml_string)
-    if not rr.find("idn-name"):
+    if rr.find("idn-name") is None:
         _name = rr.find("name").text
         if _name:
             _name = _name.encode().decode("idna")
@@ -72,6 +77,19 @@ def test_export_and_parse_a():
     assert record_parsed.a == "192.168.0.1"
 
 
+def test_export_matches_etree():
+    record = ARecord(a="192.168.0.1", name="a&b", ttl=3600, id_=10)
+    root = record.as_etree
+    ElementTree.SubElement(root, "a").text = record.a
+    assert record.to_xml() == ElementTree.tostring(root, encoding="unicode")
+
+    record = TXTRecord(txt='v=spf1 "a" <b>', name="txt")
+    root = record.as_etree
+    txt = ElementTree.SubElement(root, "txt")
+    ElementTree.SubElement(txt, "string").text = record.txt
+    assert record.to_xml() == ElementTree.tostring(root, encoding="unicode")
+
+
 def test_export_and_parse_a_idna():
     record = ARecord(a="192.168.0.2", name="тест".encode("idna").decode())
     record_xml = record.to_xml()
@@ -125,6 +143,20 @@ def test_export_and_parse_txt():
     assert record_parsed.txt == "hello world"
 
 
+def test_export_and_parse_txt_multiple_strings():
+    record = TXTRecord(txt=["v=DKIM1; k=rsa; ", "p=<key> & more"])
+    record_xml = record.to_xml()
+    assert isinstance(record_xml, str)
+    assert record_xml
+    record_parsed = _parse_record_nonstrict(record_xml)
+    assert isinstance(record_parsed, TXTRecord)
+    assert record_parsed.txt == ["v=DKIM1; k=rsa; ", "p=<key> & more"]
+
+    record = TXTRecord(txt=("v=DKIM1; k=rsa; ", "p=<key> & more"))
+    record_parsed = _parse_record_nonstrict(record.to_xml())
+    assert record_parsed.txt == ["v=DKIM1; k=rsa; ", "p=<key> & more"]
+
+
 def test_export_and_parse_srv():
     record = SRVRecord(
         priority=0,
@@ -203,3 +235,35 @@ def test_export_and_parse_rp():
     assert isinstance(record_parsed, RPRecord)
     assert record_parsed.mbox == "info.andrian.ninja."
     assert record_parsed.txt == "."
+
+
+def test_parse_records_stream():
+    records_xml = "".join(
+        ARecord(a="192.168.0.{}".format(i), name="host{}".format(i)).to_xml()
+        for i in range(1, 4)
+    )
+    records_xml = records_xml.replace(
+        "<type>", "<idn-name>host</idn-name><type>"
+    )
+    source = BytesIO(
+        '<zone name="nic-api-test.com">{}</zone>'.format(records_xml).encode()
+    )
+    records = list(parse_records_stream(source, zone="nic-api-test.com"))
+    assert [record.a for record in records] == [
+        "192.168.0.1",
+        "192.168.0.2",
+        "192.168.0.3",
+    ]
+
+    source = BytesIO('<zone name="other.com"></zone>'.encode())
+    with pytest.raises(ValueError):
+        list(parse_records_stream(source, zone="nic-api-test.com"))
+
+    source = BytesIO("<response><data/></response>".encode())
+    with pytest.raises(ValueError):
+        list(parse_records_stream(source, zone="nic-api-test.com"))
+
+
+def test_record_types():
+    for record_type, from_xml in _RECORD_PARSERS.items():
+        assert from_xml.__self__.record_type == record_type